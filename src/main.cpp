@@ -394,6 +394,15 @@ void run_expectations_mode(const std::string& personalities_list, const std::str
 }
 
 int main(int argc, char* argv[]) {
+    // Only iostreams are used, so drop C stdio sync: std::cin then reads the
+    // GUI pipe in blocks instead of one getc() per character
+    std::ios::sync_with_stdio(false);
+    // Untie cin: reading a command must not flush cout from the UCI thread while
+    // the search thread writes to it (every reply flushes explicitly instead)
+    std::cin.tie(nullptr);
+    
+    Bitboards::init();
+    
     std::cout << "FutureChamp" << std::endl;
     std::cout << "A chess engine that thinks like a coach." << std::endl;
     std::cout << std::endl;
@@ -85,7 +85,8 @@ std::vector<CandidateMove> collect_candidates(
     std::vector<CandidateMove> candidates;
     
     // Generate all moves
-    auto moves = board->generate_moves();
+    MoveList moves;
+    board->generate_moves(moves);
     
     // For each legal move, evaluate
     for (int move : moves) {
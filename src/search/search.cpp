@@ -21,11 +21,13 @@
 #include <algorithm>
 #include <random>
 #include <limits>
+#include <atomic>
 
 namespace Search {
 
 // Search state
-static bool stop_search = false;
+static std::atomic<bool> stop_search{false};
+static std::atomic<int> readyok_pending{0};  // isready lines not yet answered
 static int search_depth = 10;
 static int max_depth = 20;
 static long nodes_searched = 0;
@@ -183,7 +185,8 @@ int get_elapsed_ms() {
 
 // Check if we should stop
 bool should_stop() {
-    if (stop_search) return true;
+    if (readyok_pending.load(std::memory_order_relaxed)) flush_readyok();
+    if (stop_search.load(std::memory_order_relaxed)) return true;
     
     int elapsed = get_elapsed_ms();
     
@@ -282,45 +285,44 @@ Board make_move(const Board& board, int move) {
     int color = board.color_at(from);
     int captured = board.piece_at(to);
     
+    // Pieces move by toggling bits: XOR with from|to moves, XOR with a single bit removes
+    const uint64_t from_bb = 1ULL << from;
+    const uint64_t to_bb = 1ULL << to;
+    const uint64_t from_to = from_bb | to_bb;
+    
     // Increment halfmove clock (reset later if pawn move or capture)
     new_board.halfmove_clock++;
     
     // Handle castling
     if (flags == MOVE_CASTLE) {
         // Move king
-        new_board.remove_piece(from);
-        new_board.add_piece(to, KING, color);
+        new_board.pieces[KING] ^= from_to;
+        new_board.colors[color] ^= from_to;
         
         // Move rook
-        if (to > from) {
-            // Kingside
-            int rook_from = from + 3;
-            int rook_to = from + 1;
-            new_board.remove_piece(rook_from);
-            new_board.add_piece(rook_to, ROOK, color);
-        } else {
-            // Queenside
-            int rook_from = from - 4;
-            int rook_to = from - 1;
-            new_board.remove_piece(rook_from);
-            new_board.add_piece(rook_to, ROOK, color);
-        }
+        int rook_from = (to > from) ? from + 3 : from - 4;  // Kingside : queenside
+        int rook_to = (to > from) ? from + 1 : from - 1;
+        uint64_t rook_from_to = (1ULL << rook_from) | (1ULL << rook_to);
+        new_board.pieces[ROOK] ^= rook_from_to;
+        new_board.colors[color] ^= rook_from_to;
         
         // Remove castling rights
         new_board.castling[color][0] = false;
         new_board.castling[color][1] = false;
+        new_board.en_passant_square = -1;
         
         // Reset halfmove (castling resets it)
         new_board.halfmove_clock = 0;
     }
     // Handle en passant
     else if (flags == MOVE_EN_PASSANT) {
-        new_board.remove_piece(from);
-        new_board.add_piece(to, PAWN, color);
+        new_board.pieces[PAWN] ^= from_to;
+        new_board.colors[color] ^= from_to;
         
         // Remove captured pawn
-        int captured_sq = to + (color == WHITE ? -8 : 8);
-        new_board.remove_piece(captured_sq);
+        uint64_t captured_bb = 1ULL << (to + (color == WHITE ? -8 : 8));
+        new_board.pieces[PAWN] ^= captured_bb;
+        new_board.colors[1 - color] ^= captured_bb;
         
         new_board.en_passant_square = -1;
         
@@ -329,11 +331,13 @@ Board make_move(const Board& board, int move) {
     }
     // Handle promotion
     else if (flags == MOVE_PROMOTION) {
-        new_board.remove_piece(from);
+        new_board.pieces[PAWN] ^= from_bb;
+        new_board.colors[color] ^= from_bb;
         
         // Remove captured piece if any
         if (captured != NO_PIECE) {
-            new_board.remove_piece(to);
+            new_board.pieces[captured] ^= to_bb;
+            new_board.colors[1 - color] ^= to_bb;
         }
         
         // Promotion pieces: 0=Knight, 1=Bishop, 2=Rook, 3=Queen
@@ -345,7 +349,8 @@ Board make_move(const Board& board, int move) {
             case 3: promo_piece = QUEEN; break;
         }
         
-        new_board.add_piece(to, promo_piece, color);
+        new_board.pieces[promo_piece] |= to_bb;
+        new_board.colors[color] |= to_bb;
         new_board.en_passant_square = -1;
         
         // Pawn move or capture - reset halfmove clock
@@ -353,17 +358,17 @@ Board make_move(const Board& board, int move) {
     }
     // Normal move
     else {
-        // Move piece
-        new_board.remove_piece(from);
-        
-        // Remove captured piece if any (must do this BEFORE add_piece)
+        // Remove captured piece if any (before moving, so same-type captures work)
         if (captured != NO_PIECE && captured != KING) {
-            new_board.remove_piece(to);
+            new_board.pieces[captured] ^= to_bb;
+            new_board.colors[1 - color] ^= to_bb;
             // Capture - reset halfmove clock
             new_board.halfmove_clock = 0;
         }
         
-        new_board.add_piece(to, piece, color);
+        // Move piece
+        new_board.pieces[piece] ^= from_to;
+        new_board.colors[color] ^= from_to;
         
         // Handle pawn double push for en passant
         if (piece == PAWN) {
@@ -395,14 +400,14 @@ Board make_move(const Board& board, int move) {
                 if (from == 63) new_board.castling[BLACK][0] = false;
             }
         }
-        
-        // Update castling rights if rook is captured
-        if (captured == ROOK) {
-            if (to == 0) new_board.castling[WHITE][1] = false;
-            if (to == 7) new_board.castling[WHITE][0] = false;
-            if (to == 56) new_board.castling[BLACK][1] = false;
-            if (to == 63) new_board.castling[BLACK][0] = false;
-        }
+    }
+    
+    // Update castling rights if rook is captured (normal captures and capture-promotions)
+    if (captured == ROOK) {
+        if (to == 0) new_board.castling[WHITE][1] = false;
+        if (to == 7) new_board.castling[WHITE][0] = false;
+        if (to == 56) new_board.castling[BLACK][1] = false;
+        if (to == 63) new_board.castling[BLACK][0] = false;
     }
     
     // Switch side to move
@@ -414,43 +419,16 @@ Board make_move(const Board& board, int move) {
     }
     
     new_board.compute_hash();
+    new_board.update_check_info();
     
     return new_board;
 }
 
-// Generate pseudo-legal moves
-std::vector<int> generate_moves(const Board& board) {
-	
-    return board.generate_moves();
-}
-
-// Check if move is legal (king not in check after move)
-bool is_legal(const Board& board, int move) {
-    // Make the move on a copy
-    Board test_board = make_move(board, move);
-    
-    // Check if OUR king is in check after the move
-    int our_color = board.side_to_move;
-    
-    // Find our king in the new position
-    int king_sq = -1;
-    for (int sq = 0; sq < 64; sq++) {
-        if (test_board.piece_at(sq) == KING && test_board.color_at(sq) == our_color) {
-            king_sq = sq;
-            break;
-        }
-    }
-    
-    if (king_sq == -1) {
-        // No king? Should never happen
-        return false;
-    }
-    
-    // Check if king is attacked
-    return !Bitboards::is_square_attacked(test_board, king_sq, 1 - our_color);
+// Generate legal moves
+void generate_moves(const Board& board, MoveList& ml) {
+    board.generate_moves(ml);
 }
 
-
 // Get piece value for ordering
 int get_piece_value(int piece) {
     switch(piece) {
@@ -644,8 +622,8 @@ if (board.fullmove_number <= 10) {
 
 // Order moves for better alpha-beta performance
 
-void order_moves(std::vector<int>& moves, Board& board, int tt_move, int depth, int prev_move = 0) {
-    if (moves.empty()) return;
+void order_moves(MoveList& moves, Board& board, int tt_move, int depth, int prev_move = 0) {
+    if (moves.count == 0) return;
     
     // Get reaction killer moves if we have a previous move
     int rk0 = 0, rk1 = 0;
@@ -657,60 +635,47 @@ void order_moves(std::vector<int>& moves, Board& board, int tt_move, int depth,
     }
     
     // Score all moves
-    std::vector<std::pair<int, int>> scored_moves;  // (score, move)
-    for (int move : moves) {
+    std::pair<int, int> scored_moves[256];  // (score, move)
+    for (int i = 0; i < moves.count; i++) {
+        int move = moves[i];
         int score = score_move_for_order(board, move, tt_move, depth);
         
         // Boost reaction killers (after TT move, before killers/history)
-        // Only if the move is legal in current position
-        if (move == rk0 && is_legal(board, move)) {
+        if (move == rk0) {
             score += 86000;  // Between TT (90000) and killer (85000)
             rk_hit_this_search = true;
-        } else if (move == rk1 && is_legal(board, move)) {
+        } else if (move == rk1) {
             score += 83000;
             rk_hit_this_search = true;
         }
         
-        scored_moves.push_back({score, move});
+        scored_moves[i] = {score, move};
     }
     
     // Sort by score (descending)
-    std::sort(scored_moves.begin(), scored_moves.end(),
+    std::sort(scored_moves, scored_moves + moves.count,
               [](const std::pair<int, int>& a, const std::pair<int, int>& b) {
                   return a.first > b.first;
               });
     
-    // Update moves vector
-    moves.clear();
-    for (const auto& sm : scored_moves) {
-        moves.push_back(sm.second);
+    // Write the moves back in sorted order
+    for (int i = 0; i < moves.count; i++) {
+        moves[i] = static_cast<uint16_t>(scored_moves[i].second);
     }
 }
 
 
 // Generate candidate moves (Kotov method)
-std::vector<int> generate_candidates(const Board& board) {
-    auto all_moves = generate_moves(board);
-    std::vector<int> legal_moves;
+void generate_candidates(const Board& board, MoveList& legal_moves) {
+    generate_moves(board, legal_moves);
     
     #ifdef DEBUG
 	std::cout << "DEBUG: Position FEN: " << board.get_fen() << std::endl;
-    std::cout << "DEBUG: All pseudo-legal moves: " << all_moves.size() << std::endl;
-	#endif
-    
-    for (int move : all_moves) {
-        if (is_legal(board, move)) {
-            legal_moves.push_back(move);
-            #ifdef DEBUG
-			std::cout << "DEBUG: Legal move: " << Bitboards::move_to_uci(move) << std::endl;
-			#endif
-        }
+    for (int move : legal_moves) {
+		std::cout << "DEBUG: Legal move: " << Bitboards::move_to_uci(move) << std::endl;
     }
-    
-    #ifdef DEBUG
-	std::cout << "DEBUG: Total legal moves: " << legal_moves.size() << std::endl;
+	std::cout << "DEBUG: Total legal moves: " << legal_moves.count << std::endl;
 	#endif
-    return legal_moves;
 }
 
 
@@ -730,26 +695,8 @@ int quiescence_search(Board& board, int alpha, int beta, int color) {
     }
     
     // Generate only capture moves and promotions
-    auto all_moves = generate_moves(board);
-    std::vector<int> captures;
-    
-    for (int move : all_moves) {
-        if (!is_legal(board, move)) continue;
-        
-        int to = Bitboards::move_to(move);
-        int captured = board.piece_at(to);
-        
-        // Only include captures and promotions
-        if (captured != NO_PIECE || Bitboards::is_promotion(move)) {
-            // **NEW**: Use SEE to prune bad captures
-         //   int see_score = see(board, move);
-          //  if (see_score < -100) {
-                // Skip obviously bad captures (losing more than a pawn)
-            //    continue;
-         //  }
-            captures.push_back(move);
-        }
-    }
+    MoveList captures;
+    board.generate_captures(captures);
     
     // Order captures using MVV-LVA + SEE
     std::sort(captures.begin(), captures.end(), [&](int a, int b) {
@@ -827,9 +774,10 @@ int alpha_beta(Board& board, int depth, int alpha, int beta, int color, bool all
         tt_flag = transposition_table[idx].flag;
         
         bool tt_move_is_legal = false;
-        auto all_legal_moves = generate_moves(board);
+        MoveList all_legal_moves;
+        generate_moves(board, all_legal_moves);
         for (int legal_move : all_legal_moves) {
-            if (is_legal(board, legal_move) && legal_move == tt_move) {
+            if (legal_move == tt_move) {
                 tt_move_is_legal = true;
                 break;
             }
@@ -853,7 +801,7 @@ int alpha_beta(Board& board, int depth, int alpha, int beta, int color, bool all
         return quiescence_search(board, alpha, beta, color);
     }
     
-    bool in_check = board.is_in_check(color);
+    bool in_check = board.checkers != 0;
     
     // **NEW**: Null Move Pruning - if we can give opponent a free move and still beat beta
     // Don't do null move if:
@@ -877,6 +825,7 @@ int alpha_beta(Board& board, int depth, int alpha, int beta, int color, bool all
             null_board.side_to_move = 1 - color;
             null_board.en_passant_square = -1;
             null_board.compute_hash();
+            null_board.update_check_info();
             
             // Search with reduced depth
             int R = 2;  // Reduction factor
@@ -890,9 +839,10 @@ int alpha_beta(Board& board, int depth, int alpha, int beta, int color, bool all
     }
     
     // Generate candidate moves
-    auto moves = generate_candidates(board);
+    MoveList moves;
+    generate_candidates(board, moves);
     
-    if (moves.empty()) {
+    if (moves.count == 0) {
         // No legal moves - stalemate or checkmate
         if (in_check) {
             // **IMPROVED**: Return mate score adjusted by depth
@@ -918,7 +868,7 @@ int alpha_beta(Board& board, int depth, int alpha, int beta, int color, bool all
                 // Validate the move
                 bool iid_move_legal = false;
                 for (int m : moves) {
-                    if (is_legal(board, m) && m == iid_tt_move) {
+                    if (m == iid_tt_move) {
                         iid_move_legal = true;
                         break;
                     }
@@ -949,16 +899,16 @@ int alpha_beta(Board& board, int depth, int alpha, int beta, int color, bool all
         // Check not near mate
         if (std::abs(tt_score) < MATE_BOUND - 100) {
             // Do reduced verification search excluding TT move
-            // Create a filtered move list without TT move
-            std::vector<int> non_tt_moves;
+            bool has_alternative = false;
             for (int m : moves) {
-                if (m != tt_move) non_tt_moves.push_back(m);
+                if (m != tt_move) has_alternative = true;
             }
             
-            if (!non_tt_moves.empty()) {
+            if (has_alternative) {
                 // Try each non-TT move with reduced depth to find best alternative
                 int best_without_tt = -MATE_SCORE;
-                for (int m : non_tt_moves) {
+                for (int m : moves) {
+                    if (m == tt_move) continue;
                     Board test_board = make_move(board, m);
                     int s = -alpha_beta(test_board, depth - 3, -tt_score - 50, -tt_score, 1 - color, true, m);
                     if (s > best_without_tt) {
@@ -978,7 +928,7 @@ int alpha_beta(Board& board, int depth, int alpha, int beta, int color, bool all
     bool first_move_searched = false;
     
     // Search all moves
-    for (size_t i = 0; i < moves.size(); i++) {
+    for (int i = 0; i < moves.count; i++) {
         int move = moves[i];
         
         if (should_stop()) return 0;
@@ -1005,7 +955,7 @@ int alpha_beta(Board& board, int depth, int alpha, int beta, int color, bool all
         } else {
             // LMR: Late Move Reduction
             // Conditions: depth >= 3, not in check, quiet move, not TT move, not killer
-            int move_index = static_cast<int>(i);  // 0-based index
+            int move_index = i;  // 0-based index
             int to = Bitboards::move_to(move);
             bool is_capture = (board.piece_at(to) != NO_PIECE);
             bool is_promo = Bitboards::is_promotion(move);
@@ -1014,7 +964,7 @@ int alpha_beta(Board& board, int depth, int alpha, int beta, int color, bool all
             bool is_killer = (move == killer_moves[depth][0] || move == killer_moves[depth][1]);
             
             // Check if this move gives check - don't reduce checking moves
-            bool gives_check = new_board.is_in_check(1 - color);
+            bool gives_check = new_board.checkers != 0;
             
             // Check if we should apply LMR
             bool do_lmr = (depth >= 3 && 
@@ -1133,10 +1083,11 @@ std::vector<std::string> extract_pv(Board board, int max_depth) {
         if (move == 0) break;
         
         // **FIXED**: Verify move is legal for THIS position
-        auto legal_moves = board.generate_moves();
+        MoveList legal_moves;
+        board.generate_moves(legal_moves);
         bool found = false;
         for (int legal_move : legal_moves) {
-            if (legal_move == move && is_legal(board, legal_move)) {
+            if (legal_move == move) {
                 found = true;
                 break;
             }
@@ -1209,7 +1160,6 @@ SearchResult search(const std::string& fen, int max_time_ms_param, int max_searc
     // Set time
     max_time_ms = max_time_ms_param;
     start_time = std::chrono::steady_clock::now();
-    stop_search = false;
     nodes_searched = 0;
     
     // **IMPROVED: Ensure we search at least to depth 3**
@@ -1296,33 +1246,20 @@ SearchResult search(const std::string& fen, int max_time_ms_param, int max_searc
             tt_candidate = transposition_table[idx].move;
             
             // Validate move is legal
-            auto legal_moves = board.generate_moves();
+            MoveList legal_moves;
+            board.generate_moves(legal_moves);
             bool found = false;
             for (int legal_move : legal_moves) {
-                if (is_legal(board, legal_move) && legal_move == tt_candidate) {
+                if (legal_move == tt_candidate) {
                     found = true;
                     result.best_move = tt_candidate;
                     break;
                 }
             }
             
-            if (!found) {
-                // TT move is not legal - find any legal move as fallback
-                for (int legal_move : legal_moves) {
-                    if (is_legal(board, legal_move)) {
-                        result.best_move = legal_move;
-                        break;
-                    }
-                }
-            }
-        } else if (result.best_move == 0) {
-            // No TT move, find any legal move
-            auto legal_moves = board.generate_moves();
-            for (int legal_move : legal_moves) {
-                if (is_legal(board, legal_move)) {
-                    result.best_move = legal_move;
-                    break;
-                }
+            if (!found && legal_moves.count > 0) {
+                // TT move is not legal - fall back to any legal move
+                result.best_move = legal_moves[0];
             }
         }
         
@@ -1330,9 +1267,10 @@ SearchResult search(const std::string& fen, int max_time_ms_param, int max_searc
 		if (result.best_move != 0) {
     // Validate the move is actually legal
     bool legal = false;
-    auto all_moves = board.generate_moves();
+    MoveList all_moves;
+    board.generate_moves(all_moves);
     for (int legal_move : all_moves) {
-        if (is_legal(board, legal_move) && legal_move == result.best_move) {
+        if (legal_move == result.best_move) {
             legal = true;
             break;
         }
@@ -1415,12 +1353,12 @@ SearchResult search(const std::string& fen, int max_time_ms_param, int max_searc
             
             // Search top few moves with depth-2 to find second best
             int second_best = -MATE_SCORE;
-            auto root_moves = generate_moves(board);
+            MoveList root_moves;
+            generate_moves(board, root_moves);
             
             // Search first few moves with full window
-            for (size_t i = 0; i < std::min(root_moves.size(), size_t(6)); i++) {
+            for (int i = 0; i < std::min(root_moves.count, 6); i++) {
                 int m = root_moves[i];
-                if (!is_legal(board, m)) continue;
                 if (m == best_move && best_move != 0) continue;
                 
                 Board test_board = make_move(board, m);
@@ -1451,6 +1389,15 @@ SearchResult search(const std::string& fen, int max_time_ms_param, int max_searc
         if (should_stop()) break;
     }
     
+    // No best move yet (e.g. stopped before depth 1 finished): play any legal move
+    if (result.best_move == 0) {
+        MoveList legal_moves;
+        board.generate_moves(legal_moves);
+        if (legal_moves.count > 0) {
+            result.best_move = legal_moves[0];
+        }
+    }
+    
     result.nodes = nodes_searched;
     result.time_ms = get_elapsed_ms();
     
@@ -1514,48 +1461,80 @@ void stop() {
     stop_search = true;
 }
 
+void reset_stop() {
+    stop_search = false;
+}
+
+void request_readyok() {
+    readyok_pending.fetch_add(1);
+}
+
+void flush_readyok() {
+    // One reply per isready, even if several arrived between polls
+    for (int n = readyok_pending.exchange(0); n > 0; n--) {
+        std::cout << "readyok" << std::endl;
+    }
+}
+
 bool is_searching() {
     return !stop_search && get_elapsed_ms() < max_time_ms;
 }
 
-// Helper function for UCI position command - apply a UCI move to a FEN string
-std::string apply_uci_move(const std::string& fen, const std::string& uci_move) {
-    Board board;
-    board.set_from_fen(fen);
-    
-    // Generate all moves
-    auto all_moves = board.generate_moves();
+// Play a UCI move on the board; returns false (board unchanged) if it is not legal here
+static bool play_uci_move(Board& board, const std::string& uci_move) {
+    MoveList all_moves;
+    board.generate_moves(all_moves);
     
-    // Filter to legal moves AND convert to UCI strings at the same time
-    std::vector<std::pair<int, std::string>> legal_moves_with_uci;
+    // Find the move that matches the UCI string
     for (int move : all_moves) {
-        if (is_legal(board, move)) {
-            std::string move_uci = Bitboards::move_to_uci(move);
-            legal_moves_with_uci.push_back({move, move_uci});
+        if (Bitboards::move_to_uci(move) == uci_move) {
+            board = make_move(board, move);
+            return true;
         }
     }
+    return false;
+}
+
+// Helper for the UCI position command - apply a move list to a FEN string
+std::string apply_uci_moves(const std::string& fen, const std::vector<std::string>& uci_moves, size_t first) {
+    Board board;
+    board.set_from_fen(fen);
     
-    // Find the move that matches the UCI string
-    int matched_move = 0;
-    for (const auto& pair : legal_moves_with_uci) {
-        if (pair.second == uci_move) {
-            matched_move = pair.first;
-            break;
-        }
+    // A move that is not legal in the current position is skipped (board left as is)
+    bool changed = false;
+    for (size_t i = first; i < uci_moves.size(); i++) {
+        changed |= play_uci_move(board, uci_moves[i]);
     }
+    return changed ? board.get_fen() : fen;
+}
+
+static uint64_t perft_nodes(const Board& board, int depth) {
+    MoveList moves;
+    board.generate_moves(moves);
+    if (depth <= 1) return static_cast<uint64_t>(moves.count);
     
-    if (matched_move == 0) {
-        // Could not find move - return unchanged FEN
-        return fen;
+    uint64_t nodes = 0;
+    for (int move : moves) {
+        nodes += perft_nodes(make_move(board, move), depth - 1);
     }
+    return nodes;
+}
+
+uint64_t perft(const std::string& fen, int depth) {
+    Board board;
+    board.set_from_fen(fen);
+    if (depth < 1) return 1;
     
-    // Apply the move
-    Board new_board = make_move(board, matched_move);
-    
-    // Update move counters
-    new_board.fullmove_number = board.fullmove_number + (board.side_to_move == BLACK ? 1 : 0);
+    MoveList moves;
+    board.generate_moves(moves);
     
-    return new_board.get_fen();
+    uint64_t total = 0;
+    for (int move : moves) {
+        uint64_t nodes = depth > 1 ? perft_nodes(make_move(board, move), depth - 1) : 1;
+        std::cout << Bitboards::move_to_uci(move) << ": " << nodes << "\n";
+        total += nodes;
+    }
+    return total;
 }
 
 void set_threads(int n) {
@@ -39,14 +39,29 @@ void set_depth_limit(int depth);
 // Search position with time limit and optional depth
 SearchResult search(const std::string& fen, int max_time_ms = 30000, int max_search_depth = 10);
 
-// Stop search
+// Stop search (safe to call from another thread)
 void stop();
 
+// Clear a previous stop(); call before starting a search, so a stop that
+// arrives while the search thread is still starting up is not lost
+void reset_stop();
+
+// Have the running search print "readyok" at its next node, keeping all
+// output on the search thread
+void request_readyok();
+
+// Print one "readyok" per pending request (search thread, or once the search is over)
+void flush_readyok();
+
 // Check if search is running
 bool is_searching();
 
-// Helper function to apply a UCI move to a FEN string (for position command)
-std::string apply_uci_move(const std::string& fen, const std::string& uci_move);
+// Apply uci_moves[first..] to a FEN string, parsing and printing the FEN only once
+std::string apply_uci_moves(const std::string& fen, const std::vector<std::string>& uci_moves, size_t first = 0);
+
+// Count leaf nodes to a fixed depth (move generator check), printing
+// the count below each root move; returns the total
+uint64_t perft(const std::string& fen, int depth);
 
 } // namespace Search
 
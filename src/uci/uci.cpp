@@ -8,8 +8,11 @@
 #include "../eval/params.hpp"
 #include "../search/search.hpp"
 #include "../utils/board.hpp"
+#include <algorithm>
 #include <iostream>
+#include <mutex>
 #include <sstream>
+#include <thread>
 #include <vector>
 
 namespace UCI {
@@ -17,15 +20,40 @@ namespace UCI {
 Options options;
 static std::string current_position = "";
 
+// Last `position` command, so a GUI resending the game each ply only pays for the new moves
+static std::string position_base;
+static std::vector<std::string> position_moves;
+
+// `go` runs on its own thread so the loop keeps reading stop/isready.
+// While it runs, only that thread writes to stdout.
+static std::thread search_thread;
+static std::mutex search_mutex;
+static bool search_running = false;   // Guarded by search_mutex
+static bool search_infinite = false;  // UCI thread only
+
 // Forward declarations
 void cmd_display();
 void cmd_evaluate();
 
+// Search thread body: run the go command, then hand stdout back
+static void run_go(std::vector<std::string> tokens) {
+    cmd_go(tokens);
+    
+    std::lock_guard<std::mutex> lock(search_mutex);
+    Search::flush_readyok();
+    search_running = false;
+}
+
+// Block until the running go command (if any) has printed its bestmove
+static void wait_for_search() {
+    if (search_thread.joinable()) search_thread.join();
+}
+
 // Main UCI loop
 void loop(int argc, char* argv[]) {
     std::string cmd;
     
-    std::cout << "FutureChamp" << std::endl;
+    std::cout << "FutureChamp\n";
     std::cout << "Type 'uci' to enter UCI mode, 'quit' to exit." << std::endl;
     
     while (std::getline(std::cin, cmd)) {
@@ -33,10 +61,21 @@ void loop(int argc, char* argv[]) {
         std::string token;
         ss >> token;
         
+        // Other commands read or change state the search uses: let it finish first
+        if (token != "isready" && token != "stop" && token != "quit") {
+            wait_for_search();
+        }
+        
         if (token == "uci") {
             cmd_uci();
         } else if (token == "isready") {
-            cmd_is_ready();
+            std::unique_lock<std::mutex> lock(search_mutex);
+            if (search_running) {
+                Search::request_readyok();
+            } else {
+                lock.unlock();
+                cmd_is_ready();
+            }
         } else if (token == "quit") {
             break;
         } else if (token == "position") {
@@ -46,13 +85,21 @@ void loop(int argc, char* argv[]) {
         } else if (token == "go") {
             std::vector<std::string> tokens;
             while (ss >> token) tokens.push_back(token);
-            cmd_go(tokens);
+            search_infinite = std::find(tokens.begin(), tokens.end(), "infinite") != tokens.end();
+            
+            Search::reset_stop();
+            {
+                std::lock_guard<std::mutex> lock(search_mutex);
+                search_running = true;
+            }
+            search_thread = std::thread(run_go, std::move(tokens));
         } else if (token == "setoption") {
             std::vector<std::string> tokens;
             while (ss >> token) tokens.push_back(token);
             cmd_setoption(tokens);
         } else if (token == "stop") {
             cmd_stop();
+            wait_for_search();
         } else if (token == "d") {
             cmd_display();
         } else if (token == "eval") {
@@ -60,8 +107,15 @@ void loop(int argc, char* argv[]) {
         } else if (token == "ucinewgame") {
             // Reset for new game
             current_position = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1";
+            position_base.clear();
+            position_moves.clear();
         }
     }
+    
+    // quit or end of input: an infinite search is stopped, a limited one
+    // (`go depth N` piped with `quit`) is allowed to finish
+    if (search_infinite) cmd_stop();
+    wait_for_search();
 }
 
 // Display position for debugging
@@ -72,104 +126,106 @@ void cmd_display() {
     } else {
         b.set_start_position();
     }
-    std::cout << "FEN: " << b.get_fen() << std::endl;
-    std::cout << "Side to move: " << (b.side_to_move == 0 ? "White" : "Black") << std::endl;
-    auto moves = b.generate_moves();
-    std::cout << "Legal moves: " << moves.size() << std::endl;
+    std::cout << "FEN: " << b.get_fen() << '\n';
+    std::cout << "Side to move: " << (b.side_to_move == 0 ? "White" : "Black") << '\n';
+    MoveList moves;
+    b.generate_moves(moves);
+    std::cout << "Legal moves: " << moves.count << std::endl;
 }
 
 // Evaluate position
 void cmd_evaluate() {
     int score = Evaluation::evaluate(current_position);
-    std::cout << "Evaluation: " << score << " cp" << std::endl;
+    std::cout << "Evaluation: " << score << " cp\n";
     
     auto exp = Evaluation::explain(score, current_position);
-    std::cout << "Notes:" << std::endl;
+    std::cout << "Notes:\n";
     for (const auto& note : exp.move_reasons) {
-        std::cout << "  - " << note << std::endl;
+        std::cout << "  - " << note << '\n';
     }
     for (const auto& note : exp.imbalance_notes) {
-        std::cout << "  - " << note << std::endl;
+        std::cout << "  - " << note << '\n';
     }
+    std::cout << std::flush;
 }
 
-// UCI protocol commands
+// UCI protocol commands (one flush for the whole id/option block, at uciok)
 void cmd_uci() {
-    std::cout << "id name FutureChamp" << std::endl;
-    std::cout << "id author Brendan & Jay" << std::endl;
+    std::cout << "id name FutureChamp\n";
+    std::cout << "id author Brendan & Jay\n";
     
     // UCI options
     std::cout << "option name PlayingStyle type combo default classical " <<
-                 "var classical var attacking var tactical var positional var technical" << std::endl;
-    std::cout << "option name SkillLevel type spin default 10 min 0 max 20" << std::endl;
-    std::cout << "option name Hash type spin default 64 min 1 max 1024" << std::endl;
-    std::cout << "option name Threads type spin default 1 min 1 max 32" << std::endl;
-    std::cout << "option name UseMCTS type check default true" << std::endl;
-    std::cout << "option name VerbalPV type check default false" << std::endl;
-    std::cout << "option name ShowImbalances type check default false" << std::endl;
-    std::cout << "option name DebugEvalTrace type check default false" << std::endl;
-    std::cout << "option name DebugTraceWithParams type check default false" << std::endl;
+                 "var classical var attacking var tactical var positional var technical\n";
+    std::cout << "option name SkillLevel type spin default 10 min 0 max 20\n";
+    std::cout << "option name Hash type spin default 64 min 1 max 1024\n";
+    std::cout << "option name Threads type spin default 1 min 1 max 32\n";
+    std::cout << "option name UseMCTS type check default true\n";
+    std::cout << "option name VerbalPV type check default false\n";
+    std::cout << "option name ShowImbalances type check default false\n";
+    std::cout << "option name DebugEvalTrace type check default false\n";
+    std::cout << "option name DebugTraceWithParams type check default false\n";
     
     // === PERSONALITY ===
     std::cout << "option name Personality type combo default default "
-              << "var default var petrosian var tal var capablanca var club1800" << std::endl;
-    std::cout << "option name PersonalityAutoLoad type check default true" << std::endl;
-    std::cout << "option name SavePersonality type string default \"\"" << std::endl;
+              << "var default var petrosian var tal var capablanca var club1800\n";
+    std::cout << "option name PersonalityAutoLoad type check default true\n";
+    std::cout << "option name SavePersonality type string default \"\"\n";
     
     // === CORE MATERIAL / IMBALANCE ===
-    std::cout << "option name MaterialPriority type spin default 100 min 1 max 100" << std::endl;
-    std::cout << "option name ImbalanceScale type spin default 100 min 30 max 150" << std::endl;
-    std::cout << "option name KnightValueBias type spin default 0 min -50 max 50" << std::endl;
-    std::cout << "option name BishopValueBias type spin default 0 min -50 max 50" << std::endl;
-    std::cout << "option name ExchangeSacrificeSensitivity type spin default 100 min 0 max 200" << std::endl;
+    std::cout << "option name MaterialPriority type spin default 100 min 1 max 100\n";
+    std::cout << "option name ImbalanceScale type spin default 100 min 30 max 150\n";
+    std::cout << "option name KnightValueBias type spin default 0 min -50 max 50\n";
+    std::cout << "option name BishopValueBias type spin default 0 min -50 max 50\n";
+    std::cout << "option name ExchangeSacrificeSensitivity type spin default 100 min 0 max 200\n";
     
     // === EVAL LAYER WEIGHTS ===
-    std::cout << "option name W_PawnStructure type spin default 100 min 0 max 200" << std::endl;
-    std::cout << "option name W_PieceActivity type spin default 100 min 0 max 200" << std::endl;
-    std::cout << "option name W_KingSafety type spin default 100 min 0 max 200" << std::endl;
-    std::cout << "option name W_Initiative type spin default 100 min 0 max 200" << std::endl;
-    std::cout << "option name W_Imbalance type spin default 100 min 0 max 200" << std::endl;
-    std::cout << "option name W_KnowledgeConcepts type spin default 100 min 0 max 200" << std::endl;
+    std::cout << "option name W_PawnStructure type spin default 100 min 0 max 200\n";
+    std::cout << "option name W_PieceActivity type spin default 100 min 0 max 200\n";
+    std::cout << "option name W_KingSafety type spin default 100 min 0 max 200\n";
+    std::cout << "option name W_Initiative type spin default 100 min 0 max 200\n";
+    std::cout << "option name W_Imbalance type spin default 100 min 0 max 200\n";
+    std::cout << "option name W_KnowledgeConcepts type spin default 100 min 0 max 200\n";
     
     // === KEY MICRO TERMS ===
-    std::cout << "option name OutpostBonus type spin default 100 min 0 max 200" << std::endl;
-    std::cout << "option name BishopPairBonus type spin default 100 min 0 max 200" << std::endl;
-    std::cout << "option name RookOpenFileBonus type spin default 100 min 0 max 200" << std::endl;
-    std::cout << "option name PassedPawnBonus type spin default 100 min 0 max 200" << std::endl;
-    std::cout << "option name PawnShieldPenalty type spin default 100 min 0 max 200" << std::endl;
+    std::cout << "option name OutpostBonus type spin default 100 min 0 max 200\n";
+    std::cout << "option name BishopPairBonus type spin default 100 min 0 max 200\n";
+    std::cout << "option name RookOpenFileBonus type spin default 100 min 0 max 200\n";
+    std::cout << "option name PassedPawnBonus type spin default 100 min 0 max 200\n";
+    std::cout << "option name PawnShieldPenalty type spin default 100 min 0 max 200\n";
     
     // === KNOWLEDGE CONCEPT WEIGHTS ===
-    std::cout << "option name ConceptOutpostWeight type spin default 100 min 0 max 200" << std::endl;
-    std::cout << "option name ConceptBadBishopWeight type spin default 100 min 0 max 200" << std::endl;
-    std::cout << "option name ConceptSpaceWeight type spin default 100 min 0 max 200" << std::endl;
+    std::cout << "option name ConceptOutpostWeight type spin default 100 min 0 max 200\n";
+    std::cout << "option name ConceptBadBishopWeight type spin default 100 min 0 max 200\n";
+    std::cout << "option name ConceptSpaceWeight type spin default 100 min 0 max 200\n";
     
     // === MASTER CONCEPTS ===
-    std::cout << "option name ConceptExchangeSacWeight type spin default 100 min 0 max 200" << std::endl;
-    std::cout << "option name ConceptColorComplexWeight type spin default 100 min 0 max 200" << std::endl;
-    std::cout << "option name ConceptPawnLeverWeight type spin default 100 min 0 max 200" << std::endl;
-    std::cout << "option name ConceptInitiativePersistWeight type spin default 100 min 0 max 200" << std::endl;
-    std::cout << "option name InitiativeDominance type spin default 100 min 0 max 200" << std::endl;
+    std::cout << "option name ConceptExchangeSacWeight type spin default 100 min 0 max 200\n";
+    std::cout << "option name ConceptColorComplexWeight type spin default 100 min 0 max 200\n";
+    std::cout << "option name ConceptPawnLeverWeight type spin default 100 min 0 max 200\n";
+    std::cout << "option name ConceptInitiativePersistWeight type spin default 100 min 0 max 200\n";
+    std::cout << "option name InitiativeDominance type spin default 100 min 0 max 200\n";
     
     // === SEARCH / HUMANISATION ===
-    std::cout << "option name CandidateMarginCp type spin default 200 min 0 max 400" << std::endl;
-    std::cout << "option name CandidateMovesMax type spin default 10 min 1 max 30" << std::endl;
-    std::cout << "option name HumanEnable type check default true" << std::endl;
-    std::cout << "option name HumanSelect type check default true" << std::endl;
-    std::cout << "option name HumanTemperature type spin default 100 min 0 max 200" << std::endl;
-    std::cout << "option name HumanNoiseCp type spin default 0 min 0 max 50" << std::endl;
-    std::cout << "option name HumanBlunderRate type spin default 0 min 0 max 1000" << std::endl;
-    std::cout << "option name RandomSeed type spin default 0 min 0 max 2147483647" << std::endl;
-    std::cout << "option name RiskAppetite type spin default 100 min 0 max 200" << std::endl;
-    std::cout << "option name SacrificeBias type spin default 100 min 0 max 200" << std::endl;
-    std::cout << "option name SimplicityBias type spin default 100 min 0 max 200" << std::endl;
+    std::cout << "option name CandidateMarginCp type spin default 200 min 0 max 400\n";
+    std::cout << "option name CandidateMovesMax type spin default 10 min 1 max 30\n";
+    std::cout << "option name HumanEnable type check default true\n";
+    std::cout << "option name HumanSelect type check default true\n";
+    std::cout << "option name HumanTemperature type spin default 100 min 0 max 200\n";
+    std::cout << "option name HumanNoiseCp type spin default 0 min 0 max 50\n";
+    std::cout << "option name HumanBlunderRate type spin default 0 min 0 max 1000\n";
+    std::cout << "option name RandomSeed type spin default 0 min 0 max 2147483647\n";
+    std::cout << "option name RiskAppetite type spin default 100 min 0 max 200\n";
+    std::cout << "option name SacrificeBias type spin default 100 min 0 max 200\n";
+    std::cout << "option name SimplicityBias type spin default 100 min 0 max 200\n";
     
     // === HUMAN GUARDRAILS ===
-    std::cout << "option name HumanHardFloorCp type spin default 200 min 0 max 600" << std::endl;
-    std::cout << "option name HumanOpeningSanity type spin default 120 min 0 max 200" << std::endl;
-    std::cout << "option name HumanTopKOverride type spin default 0 min 0 max 10" << std::endl;
+    std::cout << "option name HumanHardFloorCp type spin default 200 min 0 max 600\n";
+    std::cout << "option name HumanOpeningSanity type spin default 120 min 0 max 200\n";
+    std::cout << "option name HumanTopKOverride type spin default 0 min 0 max 10\n";
     
     // === DEBUG ===
-    std::cout << "option name DebugHumanPick type check default false" << std::endl;
+    std::cout << "option name DebugHumanPick type check default false\n";
     
     std::cout << "uciok" << std::endl;
 }
@@ -220,18 +276,38 @@ void cmd_position(const std::vector<std::string>& tokens) {
         fen = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1";
     }
     
-    current_position = fen;
-    
-    // Apply moves if present using Search module's helper
+    std::vector<std::string> moves;
     if (moves_idx > 0 && moves_idx < tokens.size()) {
-        for (size_t i = moves_idx; i < tokens.size(); i++) {
-            current_position = Search::apply_uci_move(current_position, tokens[i]);
-        }
+        moves.assign(tokens.begin() + moves_idx, tokens.end());
+    }
+    
+    // Same start and the previous moves as a prefix: only play the new ones
+    size_t applied = 0;
+    if (fen == position_base && moves.size() >= position_moves.size() &&
+        std::equal(position_moves.begin(), position_moves.end(), moves.begin())) {
+        applied = position_moves.size();
+    } else {
+        current_position = fen;
+    }
+    
+    // Apply moves using Search module's helper
+    if (applied < moves.size()) {
+        current_position = Search::apply_uci_moves(current_position, moves, applied);
     }
+    
+    position_base = fen;
+    position_moves = std::move(moves);
 }
 
 
 void cmd_go(const std::vector<std::string>& tokens) {
+    // go perft N - count move generator leaves instead of searching
+    if (tokens.size() >= 2 && tokens[0] == "perft") {
+        uint64_t nodes = Search::perft(current_position, std::stoi(tokens[1]));
+        std::cout << "\nNodes searched: " << nodes << "\n" << std::endl;
+        return;
+    }
+    
     int depth = 20;  // Default max depth
     int movetime = -1;  // -1 means use time control
     int wtime = -1;
@@ -326,7 +402,8 @@ void cmd_go(const std::vector<std::string>& tokens) {
     
     // Simple validation: check if the move exists in legal moves
     bool move_is_valid = false;
-    auto all_possible_moves = verify_board.generate_moves();
+    MoveList all_possible_moves;
+    verify_board.generate_moves(all_possible_moves);
     
     // Convert best move to from/to squares for comparison
     int best_from = -1, best_to = -1;
@@ -335,7 +412,7 @@ void cmd_go(const std::vector<std::string>& tokens) {
         best_to = (best_move_uci[3] - '1') * 8 + (best_move_uci[2] - 'a');
     }
     
-    // Check all pseudo-legal moves
+    // Check all legal moves
     for (int move : all_possible_moves) {
         int from = Bitboards::move_from(move);
         int to = Bitboards::move_to(move);
@@ -414,8 +491,8 @@ void cmd_go(const std::vector<std::string>& tokens) {
             }
         }
         
-        // If still no valid move (shouldn't happen), use first pseudo-legal move
-        if (!all_possible_moves.empty()) {
+        // If still no valid move (shouldn't happen), use first legal move
+        if (all_possible_moves.count > 0) {
             best_move_uci = Bitboards::move_to_uci(all_possible_moves[0]);
         }
     }
@@ -9,6 +9,69 @@
 #include <algorithm>
 #include <cctype>
 
+#if defined(__AVX512VBMI2__) && defined(__AVX512BW__)
+#include <immintrin.h>
+#endif
+
+namespace {
+
+#if defined(__AVX512VBMI2__) && defined(__AVX512BW__)
+// Every to-square as a move from a1; OR-ing in (from << 6) moves the origin
+alignas(64) const uint16_t SPLAT_TABLE[64] = {
+     0,  1,  2,  3,  4,  5,  6,  7,  8,  9, 10, 11, 12, 13, 14, 15,
+    16, 17, 18, 19, 20, 21, 22, 23, 24, 25, 26, 27, 28, 29, 30, 31,
+    32, 33, 34, 35, 36, 37, 38, 39, 40, 41, 42, 43, 44, 45, 46, 47,
+    48, 49, 50, 51, 52, 53, 54, 55, 56, 57, 58, 59, 60, 61, 62, 63
+};
+#endif
+
+// Append a normal move from `from` to every square in `targets` (ascending order)
+inline void add_moves(MoveList& ml, int from, uint64_t targets) {
+#if defined(__AVX512VBMI2__) && defined(__AVX512BW__)
+    // Compress the selected lanes in-register and use a masked store;
+    // compress-to-memory is microcoded and slow on some cores
+    const __m512i origin = _mm512_set1_epi16(static_cast<short>(from << 6));
+    const __m512i lo = _mm512_or_si512(_mm512_load_si512(SPLAT_TABLE), origin);
+    const __m512i hi = _mm512_or_si512(_mm512_load_si512(SPLAT_TABLE + 32), origin);
+    const uint32_t lo_bits = static_cast<uint32_t>(targets);
+    const uint32_t hi_bits = static_cast<uint32_t>(targets >> 32);
+    const int lo_count = Bitboards::popcount(lo_bits);
+    const int hi_count = Bitboards::popcount(hi_bits);
+    
+    _mm512_mask_storeu_epi16(ml.moves + ml.count, static_cast<uint32_t>((1ULL << lo_count) - 1),
+                             _mm512_maskz_compress_epi16(lo_bits, lo));
+    ml.count += lo_count;
+    _mm512_mask_storeu_epi16(ml.moves + ml.count, static_cast<uint32_t>((1ULL << hi_count) - 1),
+                             _mm512_maskz_compress_epi16(hi_bits, hi));
+    ml.count += hi_count;
+#else
+    // Four moves per iteration, stored unconditionally; the count only advances
+    // by popcount, so slots written past it are junk that is overwritten later.
+    // OR-ing in bit 63 keeps ctz defined once the bitboard runs out
+    // (at most 3 spare slots: 218 legal moves + 3 < 256)
+    const int origin = from << 6;
+    const int n = Bitboards::popcount(targets);
+    uint16_t* out = ml.moves + ml.count;
+    
+    for (int k = 0; k < n; k += 4) {
+        uint64_t b = targets;
+        int s0 = Bitboards::lsb(b | (1ULL << 63)); b &= b - 1;
+        int s1 = Bitboards::lsb(b | (1ULL << 63)); b &= b - 1;
+        int s2 = Bitboards::lsb(b | (1ULL << 63)); b &= b - 1;
+        int s3 = Bitboards::lsb(b | (1ULL << 63)); b &= b - 1;
+        targets = b;
+        
+        out[k + 0] = static_cast<uint16_t>(origin | s0);
+        out[k + 1] = static_cast<uint16_t>(origin | s1);
+        out[k + 2] = static_cast<uint16_t>(origin | s2);
+        out[k + 3] = static_cast<uint16_t>(origin | s3);
+    }
+    ml.count += n;
+#endif
+}
+
+} // namespace
+
 void Board::set_start_position() {
     clear();
     
@@ -42,6 +105,7 @@ void Board::set_start_position() {
     halfmove_clock = 0;
     
     compute_hash();
+    update_check_info();
 }
 
 bool Board::set_from_fen(const std::string& fen) {
@@ -111,6 +175,7 @@ bool Board::set_from_fen(const std::string& fen) {
     }
     
     compute_hash();
+    update_check_info();
     return true;
 }
 
@@ -249,11 +314,12 @@ void Board::compute_hash() {
     }
     
     // Hash piece positions
-    for (int sq = 0; sq < 64; sq++) {
-        int p = piece_at(sq);
-        if (p != NO_PIECE) {
-            int c = color_at(sq);
-            hash ^= piece_keys[c][p][sq];
+    for (int c = WHITE; c <= BLACK; c++) {
+        for (int p = PAWN; p <= KING; p++) {
+            uint64_t bb = pieces[p] & colors[c];
+            while (bb) {
+                hash ^= piece_keys[c][p][Bitboards::pop_lsb(bb)];
+            }
         }
     }
     
@@ -275,184 +341,238 @@ void Board::compute_hash() {
 }
 
 
-bool Board::is_in_check(int color) const {
-    int king_sq = -1;
-    for (int sq = 0; sq < 64; sq++) {
-        if (piece_at(sq) == KING && color_at(sq) == color) {
-            king_sq = sq;
-            break;
+void Board::update_check_info() {
+    checkers = pinned = 0;
+    
+    uint64_t king = pieces[KING] & colors[side_to_move];
+    if (!king) return;
+    
+    int king_sq = Bitboards::lsb(king);
+    uint64_t them = colors[1 - side_to_move];
+    uint64_t all = all_pieces();
+    
+    checkers = Bitboards::attackers_to(*this, king_sq, all) & them;
+    
+    // Enemy sliders on an open line to our king, with exactly one of our pieces in between
+    uint64_t snipers = ((Bitboards::rook_attacks(king_sq, 0) & (pieces[ROOK] | pieces[QUEEN])) |
+                        (Bitboards::bishop_attacks(king_sq, 0) & (pieces[BISHOP] | pieces[QUEEN]))) & them;
+    while (snipers) {
+        int sq = Bitboards::pop_lsb(snipers);
+        uint64_t blockers = Bitboards::between(king_sq, sq) & all;
+        if (blockers && !(blockers & (blockers - 1)) && (blockers & colors[side_to_move])) {
+            pinned |= blockers;
         }
     }
-    if (king_sq == -1) return false;
-    return Bitboards::is_square_attacked(*this, king_sq, 1 - color);
 }
 
+bool Board::is_in_check(int color) const {
+    uint64_t king = pieces[KING] & colors[color];
+    if (!king) return false;
+    return Bitboards::is_square_attacked(*this, Bitboards::lsb(king), 1 - color);
+}
 
-std::vector<int> Board::generate_moves() const {
-    std::vector<int> moves;
-    moves.reserve(128); // Pre-allocate to reduce reallocations
+
+template <Color Us, GenType Type>
+void Board::generate_moves(MoveList& ml) const {
+    constexpr Color Them = (Us == WHITE) ? BLACK : WHITE;
+    constexpr bool CapturesOnly = (Type == GT_CAPTURES);
+    
+    ml.count = 0;
     
-    uint64_t our_pieces = pieces_of_color(side_to_move);
-    uint64_t enemy_pieces = pieces_of_color(1 - side_to_move);
+    uint64_t our_pieces = colors[Us];
+    uint64_t enemy_pieces = colors[Them];
     uint64_t all = all_pieces();
     
-    // 1. Pawn moves
-    uint64_t pawns = pieces[PAWN] & colors[side_to_move];
-    while (pawns) {
-        int sq = Bitboards::pop_lsb(pawns);
-        int rank = Bitboards::rank_of(sq);
-        int file = Bitboards::file_of(sq);
-        
-        // Forward direction
-        int forward_dir = (side_to_move == WHITE) ? 8 : -8;
-        
-        // Single push
-        int forward = sq + forward_dir;
-        if (forward >= 0 && forward < 64 && is_empty(forward)) {
-            int to_rank = Bitboards::rank_of(forward);
+    uint64_t king = pieces[KING] & colors[Us];
+    int king_sq = king ? Bitboards::lsb(king) : -1;
+    
+    // Squares a non-king move may land on: anywhere, or when in check,
+    // the checker and the squares between it and our king
+    uint64_t target_mask = ~0ULL;
+    if (checkers) {
+        target_mask = (checkers & (checkers - 1))
+                    ? 0  // Double check - only the king may move
+                    : checkers | Bitboards::between(king_sq, Bitboards::lsb(checkers));
+    }
+    
+    // Pinned pieces may only move along the line through our king
+    auto legal_targets = [&](int from) {
+        return Bitboards::test(pinned, from) ? target_mask & Bitboards::line(king_sq, from) : target_mask;
+    };
+    
+    // Captures only: non-pawn moves must land on an enemy piece
+    const uint64_t piece_targets = CapturesOnly ? enemy_pieces : ~our_pieces;
+    
+    // Pawn geometry for this side, folded at compile time
+    constexpr int Up = (Us == WHITE) ? 8 : -8;
+    constexpr int StartRank = (Us == WHITE) ? 1 : 6;
+    constexpr int PromoRank = (Us == WHITE) ? 7 : 0;
+    
+    // En passant removes two pieces from one rank, so check it by occupancy
+    auto en_passant_is_legal = [&](int from, int to) {
+        if (king_sq == -1) return true;
+        int captured_sq = to - Up;
+        uint64_t occupied = (all ^ (1ULL << from) ^ (1ULL << captured_sq)) | (1ULL << to);
+        uint64_t attackers = Bitboards::attackers_to(*this, king_sq, occupied) & enemy_pieces;
+        return !(attackers & ~(1ULL << captured_sq));
+    };
+    
+    if (target_mask) {
+        // 1. Pawn moves
+        uint64_t pawns = pieces[PAWN] & colors[Us];
+        while (pawns) {
+            int sq = Bitboards::pop_lsb(pawns);
+            int rank = Bitboards::rank_of(sq);
+            int file = Bitboards::file_of(sq);
+            uint64_t targets = legal_targets(sq);
             
-            // Promotion?
-            if ((side_to_move == WHITE && to_rank == 7) || 
-                (side_to_move == BLACK && to_rank == 0)) {
-                // Generate all promotion options
-                moves.push_back(Bitboards::make_move(sq, forward, MOVE_PROMOTION, 0)); // Knight
-                moves.push_back(Bitboards::make_move(sq, forward, MOVE_PROMOTION, 1)); // Bishop
-                moves.push_back(Bitboards::make_move(sq, forward, MOVE_PROMOTION, 2)); // Rook
-                moves.push_back(Bitboards::make_move(sq, forward, MOVE_PROMOTION, 3)); // Queen
-            } else {
-                moves.push_back(Bitboards::make_move(sq, forward));
+            // Single push
+            int forward = sq + Up;
+            if (forward >= 0 && forward < 64 && !Bitboards::test(all, forward)) {
+                int to_rank = Bitboards::rank_of(forward);
                 
-                // Double push from starting rank
-                int start_rank = (side_to_move == WHITE) ? 1 : 6;
-                if (rank == start_rank) {
-                    int double_forward = forward + forward_dir;
-                    if (double_forward >= 0 && double_forward < 64 && is_empty(double_forward)) {
-                        moves.push_back(Bitboards::make_move(sq, double_forward));
+                // Promotion? (the only pushes kept when generating captures)
+                if (to_rank == PromoRank) {
+                    if (Bitboards::test(targets, forward)) {
+                        // Generate all promotion options
+                        ml.add(Bitboards::make_move(sq, forward, MOVE_PROMOTION, 0)); // Knight
+                        ml.add(Bitboards::make_move(sq, forward, MOVE_PROMOTION, 1)); // Bishop
+                        ml.add(Bitboards::make_move(sq, forward, MOVE_PROMOTION, 2)); // Rook
+                        ml.add(Bitboards::make_move(sq, forward, MOVE_PROMOTION, 3)); // Queen
+                    }
+                } else if (!CapturesOnly) {
+                    if (Bitboards::test(targets, forward)) {
+                        ml.add(Bitboards::make_move(sq, forward));
+                    }
+                    
+                    // Double push from starting rank
+                    if (rank == StartRank) {
+                        int double_forward = forward + Up;
+                        if (double_forward >= 0 && double_forward < 64 && !Bitboards::test(all, double_forward) &&
+                            Bitboards::test(targets, double_forward)) {
+                            ml.add(Bitboards::make_move(sq, double_forward));
+                        }
                     }
                 }
             }
-        }
-        
-        // Captures - precompute target squares
-        int capture_targets[2] = {-1, -1};
-        int capture_count = 0;
-        
-        // Left capture (relative to pawn direction)
-        if (file > 0) {
-            int left_cap = sq + forward_dir - 1;
-            if (left_cap >= 0 && left_cap < 64) {
-                capture_targets[capture_count++] = left_cap;
-            }
-        }
-        
-        // Right capture (relative to pawn direction)
-        if (file < 7) {
-            int right_cap = sq + forward_dir + 1;
-            if (right_cap >= 0 && right_cap < 64) {
-                capture_targets[capture_count++] = right_cap;
+            
+            // Captures - precompute target squares
+            int capture_targets[2] = {-1, -1};
+            int capture_count = 0;
+            
+            // Left capture (relative to pawn direction)
+            if (file > 0) {
+                int left_cap = sq + Up - 1;
+                if (left_cap >= 0 && left_cap < 64) {
+                    capture_targets[capture_count++] = left_cap;
+                }
             }
-        }
-        
-        for (int i = 0; i < capture_count; i++) {
-            int cap = capture_targets[i];
-            int to_rank = Bitboards::rank_of(cap);
             
-            // Normal capture
-            if (Bitboards::test(enemy_pieces, cap)) {
-                if ((side_to_move == WHITE && to_rank == 7) || 
-                    (side_to_move == BLACK && to_rank == 0)) {
-                    // Promotion capture
-                    moves.push_back(Bitboards::make_move(sq, cap, MOVE_PROMOTION, 0)); // Knight
-                    moves.push_back(Bitboards::make_move(sq, cap, MOVE_PROMOTION, 1)); // Bishop
-                    moves.push_back(Bitboards::make_move(sq, cap, MOVE_PROMOTION, 2)); // Rook
-                    moves.push_back(Bitboards::make_move(sq, cap, MOVE_PROMOTION, 3)); // Queen
-                } else {
-                    moves.push_back(Bitboards::make_move(sq, cap));
+            // Right capture (relative to pawn direction)
+            if (file < 7) {
+                int right_cap = sq + Up + 1;
+                if (right_cap >= 0 && right_cap < 64) {
+                    capture_targets[capture_count++] = right_cap;
                 }
             }
-            // En passant
-            else if (cap == en_passant_square) {
-                moves.push_back(Bitboards::make_move(sq, cap, MOVE_EN_PASSANT));
+            
+            for (int i = 0; i < capture_count; i++) {
+                int cap = capture_targets[i];
+                int to_rank = Bitboards::rank_of(cap);
+                
+                // Normal capture
+                if (Bitboards::test(enemy_pieces, cap)) {
+                    if (!Bitboards::test(targets, cap)) continue;
+                    
+                    if (to_rank == PromoRank) {
+                        // Promotion capture
+                        ml.add(Bitboards::make_move(sq, cap, MOVE_PROMOTION, 0)); // Knight
+                        ml.add(Bitboards::make_move(sq, cap, MOVE_PROMOTION, 1)); // Bishop
+                        ml.add(Bitboards::make_move(sq, cap, MOVE_PROMOTION, 2)); // Rook
+                        ml.add(Bitboards::make_move(sq, cap, MOVE_PROMOTION, 3)); // Queen
+                    } else {
+                        ml.add(Bitboards::make_move(sq, cap));
+                    }
+                }
+                // En passant (not a capture onto an occupied square, so left to GT_ALL)
+                else if (!CapturesOnly && cap == en_passant_square && en_passant_is_legal(sq, cap)) {
+                    ml.add(Bitboards::make_move(sq, cap, MOVE_EN_PASSANT));
+                }
             }
         }
-    }
-    
-    // 2. Knight moves
-    uint64_t knights = pieces[KNIGHT] & colors[side_to_move];
-    while (knights) {
-        int sq = Bitboards::pop_lsb(knights);
-        uint64_t attacks = Bitboards::knight_attacks(sq);
         
-        // Filter out squares occupied by our pieces
-        attacks &= ~our_pieces;
-        
-        while (attacks) {
-            int to = Bitboards::pop_lsb(attacks);
-            moves.push_back(Bitboards::make_move(sq, to));
+        // 2. Knight moves (a pinned knight can never move)
+        uint64_t knights = pieces[KNIGHT] & colors[Us] & ~pinned;
+        while (knights) {
+            int sq = Bitboards::pop_lsb(knights);
+            uint64_t attacks = Bitboards::knight_attacks(sq);
+            
+            // Filter out squares occupied by our pieces
+            attacks &= piece_targets & target_mask;
+            
+            add_moves(ml, sq, attacks);
         }
-    }
-    
-    // 3. Bishop moves
-    uint64_t bishops = pieces[BISHOP] & colors[side_to_move];
-    while (bishops) {
-        int sq = Bitboards::pop_lsb(bishops);
-        uint64_t attacks = Bitboards::bishop_attacks(sq, all);
-        
-        // Filter out squares occupied by our pieces
-        attacks &= ~our_pieces;
         
-        while (attacks) {
-            int to = Bitboards::pop_lsb(attacks);
-            moves.push_back(Bitboards::make_move(sq, to));
+        // 3. Bishop moves
+        uint64_t bishops = pieces[BISHOP] & colors[Us];
+        while (bishops) {
+            int sq = Bitboards::pop_lsb(bishops);
+            uint64_t attacks = Bitboards::bishop_attacks(sq, all);
+            
+            // Filter out squares occupied by our pieces
+            attacks &= piece_targets & legal_targets(sq);
+            
+            add_moves(ml, sq, attacks);
         }
-    }
-    
-    // 4. Rook moves
-    uint64_t rooks = pieces[ROOK] & colors[side_to_move];
-    while (rooks) {
-        int sq = Bitboards::pop_lsb(rooks);
-        uint64_t attacks = Bitboards::rook_attacks(sq, all);
         
-        // Filter out squares occupied by our pieces
-        attacks &= ~our_pieces;
-        
-        while (attacks) {
-            int to = Bitboards::pop_lsb(attacks);
-            moves.push_back(Bitboards::make_move(sq, to));
+        // 4. Rook moves
+        uint64_t rooks = pieces[ROOK] & colors[Us];
+        while (rooks) {
+            int sq = Bitboards::pop_lsb(rooks);
+            uint64_t attacks = Bitboards::rook_attacks(sq, all);
+            
+            // Filter out squares occupied by our pieces
+            attacks &= piece_targets & legal_targets(sq);
+            
+            add_moves(ml, sq, attacks);
         }
-    }
-    
-    // 5. Queen moves
-    uint64_t queens = pieces[QUEEN] & colors[side_to_move];
-    while (queens) {
-        int sq = Bitboards::pop_lsb(queens);
-        uint64_t attacks = Bitboards::queen_attacks(sq, all);
-        
-        // Filter out squares occupied by our pieces
-        attacks &= ~our_pieces;
         
-        while (attacks) {
-            int to = Bitboards::pop_lsb(attacks);
-            moves.push_back(Bitboards::make_move(sq, to));
+        // 5. Queen moves
+        uint64_t queens = pieces[QUEEN] & colors[Us];
+        while (queens) {
+            int sq = Bitboards::pop_lsb(queens);
+            uint64_t attacks = Bitboards::queen_attacks(sq, all);
+            
+            // Filter out squares occupied by our pieces
+            attacks &= piece_targets & legal_targets(sq);
+            
+            add_moves(ml, sq, attacks);
         }
     }
     
     // 6. King moves - WITH OPTIMIZED CASTLING
-    uint64_t kings = pieces[KING] & colors[side_to_move];
-    while (kings) {
-        int sq = Bitboards::pop_lsb(kings);
+    if (king_sq != -1) {
+        int sq = king_sq;
         uint64_t attacks = Bitboards::king_attacks(sq);
         
         // Filter out squares occupied by our pieces
-        attacks &= ~our_pieces;
+        attacks &= piece_targets;
         
+        // Drop attacked squares; the king itself is lifted off the board
+        // so it cannot hide behind its own square from a slider
+        uint64_t occupied = all ^ king;
+        uint64_t safe_targets = 0;
         while (attacks) {
             int to = Bitboards::pop_lsb(attacks);
-            moves.push_back(Bitboards::make_move(sq, to));
+            if (!(Bitboards::attackers_to(*this, to, occupied) & enemy_pieces)) {
+                Bitboards::set(safe_targets, to);
+            }
         }
         
+        add_moves(ml, sq, safe_targets);
+        
         // Castling - only if not in check
-        if (!is_in_check(side_to_move)) {
+        if (!CapturesOnly && !checkers) {
             // Precomputed castling data
             static const struct {
                 int king_from;
@@ -472,12 +592,18 @@ std::vector<int> Board::generate_moves() const {
                 }
             };
             
+            // King and rook must still stand on their home squares: rights can be
+            // stale in a hand-written FEN, and make_move toggles the rook bits
+            const uint64_t our_rooks = pieces[ROOK] & colors[Us];
+            
             // Kingside castling
-            if (castling[side_to_move][0]) {
-                const auto& data = CASTLING_DATA[side_to_move][0];
+            if (castling[Us][0]) {
+                const auto& data = CASTLING_DATA[Us][0];
                 
-                // Check squares between king and rook are empty using bitmask
-                bool path_clear = (all & data.path_mask) == 0;
+                // King and rook at home, squares between them empty (bitmask)
+                bool path_clear = (all & data.path_mask) == 0 &&
+                                  king_sq == data.king_from &&
+                                  Bitboards::test(our_rooks, data.rook_from);
                 
                 // Check king doesn't pass through or land in check
                 if (path_clear) {
@@ -487,24 +613,26 @@ std::vector<int> Board::generate_moves() const {
                     uint64_t check_mask = data.check_squares_mask;
                     while (check_mask) {
                         int check_sq = Bitboards::pop_lsb(check_mask);
-                        if (Bitboards::is_square_attacked(*this, check_sq, 1 - side_to_move)) {
+                        if (Bitboards::is_square_attacked(*this, check_sq, Them)) {
                             safe = false;
                             break;
                         }
                     }
                     
                     if (safe) {
-                        moves.push_back(Bitboards::make_move(data.king_from, data.king_to, MOVE_CASTLE));
+                        ml.add(Bitboards::make_move(data.king_from, data.king_to, MOVE_CASTLE));
                     }
                 }
             }
             
             // Queenside castling
-            if (castling[side_to_move][1]) {
-                const auto& data = CASTLING_DATA[side_to_move][1];
+            if (castling[Us][1]) {
+                const auto& data = CASTLING_DATA[Us][1];
                 
-                // Check squares between king and rook are empty
-                bool path_clear = (all & data.path_mask) == 0;
+                // King and rook at home, squares between them empty
+                bool path_clear = (all & data.path_mask) == 0 &&
+                                  king_sq == data.king_from &&
+                                  Bitboards::test(our_rooks, data.rook_from);
                 
                 // Check king doesn't pass through or land in check
                 if (path_clear) {
@@ -514,23 +642,43 @@ std::vector<int> Board::generate_moves() const {
                     uint64_t check_mask = data.check_squares_mask;
                     while (check_mask) {
                         int check_sq = Bitboards::pop_lsb(check_mask);
-                        if (Bitboards::is_square_attacked(*this, check_sq, 1 - side_to_move)) {
+                        if (Bitboards::is_square_attacked(*this, check_sq, Them)) {
                             safe = false;
                             break;
                         }
                     }
                     
                     if (safe) {
-                        moves.push_back(Bitboards::make_move(data.king_from, data.king_to, MOVE_CASTLE));
+                        ml.add(Bitboards::make_move(data.king_from, data.king_to, MOVE_CASTLE));
                     }
                 }
             }
         }
     }
-    
-    return moves;
 }
 
+// Dispatch once on side to move to the specialised generators
+void Board::generate_moves(MoveList& ml) const {
+    if (side_to_move == WHITE) {
+        generate_moves<WHITE, GT_ALL>(ml);
+    } else {
+        generate_moves<BLACK, GT_ALL>(ml);
+    }
+}
+
+void Board::generate_captures(MoveList& ml) const {
+    if (side_to_move == WHITE) {
+        generate_moves<WHITE, GT_CAPTURES>(ml);
+    } else {
+        generate_moves<BLACK, GT_CAPTURES>(ml);
+    }
+}
+
+template void Board::generate_moves<WHITE, GT_ALL>(MoveList&) const;
+template void Board::generate_moves<BLACK, GT_ALL>(MoveList&) const;
+template void Board::generate_moves<WHITE, GT_CAPTURES>(MoveList&) const;
+template void Board::generate_moves<BLACK, GT_CAPTURES>(MoveList&) const;
+
 
 
 namespace Bitboards {
@@ -556,8 +704,8 @@ uint64_t knight_attacks(int square) {
 
 uint64_t king_attacks(int square) {
     static const uint64_t table[64] = {
-        0x0000000000000302ULL, 0x0000000000000507ULL, 0x0000000000000A0EULL, 0x000000000000141CULL,
-        0x0000000000002838ULL, 0x0000000000005070ULL, 0x000000000000A0E0ULL, 0x00000000000040C0ULL,
+        0x0000000000000302ULL, 0x0000000000000705ULL, 0x0000000000000E0AULL, 0x0000000000001C14ULL,
+        0x0000000000003828ULL, 0x0000000000007050ULL, 0x000000000000E0A0ULL, 0x000000000000C040ULL,
         0x0000000000030203ULL, 0x0000000000070507ULL, 0x00000000000E0A0EULL, 0x00000000001C141CULL,
         0x0000000000382838ULL, 0x0000000000705070ULL, 0x0000000000E0A0E0ULL, 0x0000000000C040C0ULL,
         0x0000000003020300ULL, 0x0000000007050700ULL, 0x000000000E0A0E00ULL, 0x000000001C141C00ULL,
@@ -577,77 +725,6 @@ uint64_t king_attacks(int square) {
 }
 
 
-uint64_t bishop_attacks(int square, uint64_t blockers) {
-    uint64_t attacks = 0;
-    
-    // Directions: up-right, up-left, down-right, down-left
-    int dirs[4][2] = {{1, 1}, {1, -1}, {-1, 1}, {-1, -1}};
-    
-    for (int d = 0; d < 4; d++) {
-        int dx = dirs[d][0];
-        int dy = dirs[d][1];
-        
-        int x = Bitboards::file_of(square);
-        int y = Bitboards::rank_of(square);
-        
-        for (int step = 1; step < 8; step++) {
-            int nx = x + dx * step;
-            int ny = y + dy * step;
-            
-            if (nx < 0 || nx >= 8 || ny < 0 || ny >= 8) break;
-            
-            int nsq = nx + ny * 8;
-            Bitboards::set(attacks, nsq);
-            
-            if (blockers & (1ULL << nsq)) {
-                break; // Blocked by a piece
-            }
-        }
-    }
-    
-    return attacks;
-}
-
-
-
-uint64_t rook_attacks(int square, uint64_t blockers) {
-    uint64_t attacks = 0;
-    int file = file_of(square);
-    int rank = rank_of(square);
-    
-    // North
-    for (int r = rank + 1; r < 8; r++) {
-        int sq = file + r * 8;
-        set(attacks, sq);
-        if (blockers & (1ULL << sq)) break;
-    }
-    
-    // South
-    for (int r = rank - 1; r >= 0; r--) {
-        int sq = file + r * 8;
-        set(attacks, sq);
-        if (blockers & (1ULL << sq)) break;
-    }
-    
-    // East
-    for (int f = file + 1; f < 8; f++) {
-        int sq = f + rank * 8;
-        set(attacks, sq);
-        if (blockers & (1ULL << sq)) break;
-    }
-    
-    // West
-    for (int f = file - 1; f >= 0; f--) {
-        int sq = f + rank * 8;
-        set(attacks, sq);
-        if (blockers & (1ULL << sq)) break;
-    }
-    
-    return attacks;
-}
-
-
-
 uint64_t queen_attacks(int square, uint64_t blockers) {
     return bishop_attacks(square, blockers) | rook_attacks(square, blockers);
 }
@@ -669,6 +746,15 @@ uint64_t pawn_attacks(int square, int color) {
     return attacks;
 }
 
+uint64_t attackers_to(const Board& board, int square, uint64_t occupied) {
+    return (Bitboards::pawn_attacks(square, BLACK) & board.pieces[PAWN] & board.colors[WHITE]) |
+           (Bitboards::pawn_attacks(square, WHITE) & board.pieces[PAWN] & board.colors[BLACK]) |
+           (Bitboards::knight_attacks(square) & board.pieces[KNIGHT]) |
+           (Bitboards::king_attacks(square) & board.pieces[KING]) |
+           (Bitboards::bishop_attacks(square, occupied) & (board.pieces[BISHOP] | board.pieces[QUEEN])) |
+           (Bitboards::rook_attacks(square, occupied) & (board.pieces[ROOK] | board.pieces[QUEEN]));
+}
+
 bool is_square_attacked(const Board& board, int square, int color) {
     uint64_t enemy_pawns = board.pieces[PAWN] & board.colors[color];
     uint64_t enemy_knights = board.pieces[KNIGHT] & board.colors[color];
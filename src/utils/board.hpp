@@ -24,9 +24,9 @@
 #ifndef BOARD_HPP
 #define BOARD_HPP
 
+#include <cstddef>
 #include <cstdint>
 #include <string>
-#include <vector>
 
 inline uint64_t attack_bb[2]; // [color] - precomputed attacks
 
@@ -57,9 +57,32 @@ enum MoveFlags {
     MOVE_PROMOTION = 3
 };
 
+// What generate_moves emits
+enum GenType {
+    GT_ALL,       // Every legal move
+    GT_CAPTURES   // Legal captures and promotions (quiescence search)
+};
+
+// Fixed-capacity move list filled by the generator (218 is the legal maximum)
+struct MoveList {
+    uint16_t moves[256];
+    int count = 0;
+    
+    void add(int move) { moves[count++] = static_cast<uint16_t>(move); }
+    
+    // Contiguous range, so `for (int move : list)` works directly
+    uint16_t* begin() { return moves; }
+    uint16_t* end() { return moves + count; }
+    const uint16_t* begin() const { return moves; }
+    const uint16_t* end() const { return moves + count; }
+    size_t size() const { return static_cast<size_t>(count); }
+    uint16_t& operator[](size_t i) { return moves[i]; }
+    uint16_t operator[](size_t i) const { return moves[i]; }
+};
+
 struct Board {
-    // Bitboards for each piece type
-    uint64_t pieces[7];  // [piece_type]
+    // Bitboards for each piece type (the bitboard block starts on a cache line)
+    alignas(64) uint64_t pieces[7];  // [piece_type]
     
     // Bitboards for each color
     uint64_t colors[2];   // [color]
@@ -80,6 +103,10 @@ struct Board {
     // Hash for transposition table
     uint64_t hash;
     
+    // Check info for the side to move (refreshed by update_check_info)
+    uint64_t checkers;  // Enemy pieces giving check
+    uint64_t pinned;    // Our pieces pinned to our king
+    
     Board() {
         reset();
     }
@@ -94,6 +121,7 @@ struct Board {
         fullmove_number = 1;
         halfmove_clock = 0;
         hash = 0;
+        checkers = pinned = 0;
     }
     
     // Set up starting position
@@ -135,11 +163,21 @@ struct Board {
     // Generate hash
     void compute_hash();
     
+    // Recompute checkers/pinned (after any change to pieces or side to move)
+    void update_check_info();
+    
     // Is side in check?
     bool is_in_check(int color) const;
     
-    // Generate pseudo-legal moves (for evaluation)
-    std::vector<int> generate_moves() const;
+    // Generate legal moves into a caller-provided list
+    void generate_moves(MoveList& ml) const;
+    
+    // Generate legal captures and promotions only
+    void generate_captures(MoveList& ml) const;
+    
+    // Side-specialised generator behind the two above (instantiated in board.cpp)
+    template <Color Us, GenType Type>
+    void generate_moves(MoveList& ml) const;
 };
 
 // Bitboard operations
@@ -228,7 +266,16 @@ namespace Bitboards {
     // Generate king moves
     uint64_t king_attacks(int square);
     
-    // Generate sliding attacks (bishop/rook/queen)
+    // Build the magic slider attack tables and line tables (call once at startup)
+    void init();
+    
+    // Squares strictly between two aligned squares (0 if not aligned)
+    uint64_t between(int from, int to);
+    
+    // Full board line through two aligned squares (0 if not aligned)
+    uint64_t line(int from, int to);
+    
+    // Generate sliding attacks (bishop/rook/queen) - magic lookups, see magics.cpp
     uint64_t bishop_attacks(int square, uint64_t blockers);
     uint64_t rook_attacks(int square, uint64_t blockers);
     uint64_t queen_attacks(int square, uint64_t blockers);
@@ -242,6 +289,9 @@ namespace Bitboards {
     // Is square attacked by color?
     bool is_square_attacked(const Board& board, int square, int color);
     
+    // Pieces of both colors attacking square, with the given occupancy
+    uint64_t attackers_to(const Board& board, int square, uint64_t occupied);
+    
     // All attacks by color
     uint64_t all_attacks(const Board& board, int color);
     
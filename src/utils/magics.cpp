@@ -0,0 +1,182 @@
+/**
+ * Magic Bitboards for Sliding Pieces
+ *
+ * Rook and bishop attacks are a multiply, a shift and one table load:
+ *   attacks = table[sq][((occupied & mask[sq]) * magic[sq]) >> shift[sq]]
+ *
+ * The magic numbers are fixed constants; the attack tables are filled once
+ * by Bitboards::init() at startup. Building with -DUSE_PEXT on BMI2 hardware
+ * indexes with _pext_u64 instead, but PEXT is microcoded on AMD before Zen 3,
+ * so magics stay the default.
+ *
+ * init() also fills the between/line tables used for pin and check masks.
+ */
+
+#include "board.hpp"
+
+#if defined(USE_PEXT) && defined(__BMI2__)
+#include <immintrin.h>
+#define MAGICS_PEXT 1
+#endif
+
+namespace Bitboards {
+
+namespace {
+
+struct Magic {
+    uint64_t mask;       // Relevant occupancy (ray squares minus board edges)
+    uint64_t magic;
+    uint64_t* attacks;   // This square's slice of the attack table
+    int shift;
+    
+    unsigned index(uint64_t occupied) const {
+#ifdef MAGICS_PEXT
+        return static_cast<unsigned>(_pext_u64(occupied, mask));
+#else
+        return static_cast<unsigned>(((occupied & mask) * magic) >> shift);
+#endif
+    }
+};
+
+constexpr int ROOK_BITS = 12;
+constexpr int BISHOP_BITS = 9;
+
+constexpr int ROOK_DIRS[4][2] = {{1, 0}, {-1, 0}, {0, 1}, {0, -1}};
+constexpr int BISHOP_DIRS[4][2] = {{1, 1}, {1, -1}, {-1, 1}, {-1, -1}};
+
+constexpr uint64_t ROOK_MAGICS[64] = {
+    0x048000C001106483ULL, 0x0100090040003420ULL, 0x0A00088040060024ULL, 0x1001001000308A00ULL,
+    0x0202020004180011ULL, 0x2020040D000A0080ULL, 0xC020004401001080ULL, 0x1200005100208402ULL,
+    0x0004A00800100020ULL, 0x12020C008C401000ULL, 0x0300290008000400ULL, 0x0000100100020010ULL,
+    0x2052202201000820ULL, 0x0000810004000080ULL, 0x0009400040842401ULL, 0x5012400080280040ULL,
+    0x0800100208900408ULL, 0x0050044000144020ULL, 0x0202020010084081ULL, 0x40002012000C4082ULL,
+    0x0200100100884008ULL, 0x0000011810022281ULL, 0x0000260001810044ULL, 0x0020173001E1001DULL,
+    0x0029101408118080ULL, 0x0421004048010400ULL, 0x0020000408041080ULL, 0x2401110200042440ULL,
+    0x00901A4020200422ULL, 0x600288430042040AULL, 0x4020231040008088ULL, 0x0081012010004903ULL,
+    0x01001040400A202AULL, 0x00500A0800100400ULL, 0x0A80804012000804ULL, 0x2041100004800800ULL,
+    0x0000880001802400ULL, 0x1010020000840022ULL, 0x0B03002088068010ULL, 0x0008204102000024ULL,
+    0x0072451106A04000ULL, 0x008E218008002010ULL, 0x0800164011403000ULL, 0x0000108008040420ULL,
+    0x0020100102201804ULL, 0x40008C0010181802ULL, 0x40244C0090004250ULL, 0xA041000204480130ULL,
+    0x8200610080403180ULL, 0x50028C2040002148ULL, 0x0104120422048080ULL, 0x0012200408400200ULL,
+    0x1048880012048140ULL, 0x0080010180020028ULL, 0x0020108000482004ULL, 0x801C012008814008ULL,
+    0x094010210A004082ULL, 0x0001000840102282ULL, 0x1082A000D4500901ULL, 0x0500060002401022ULL,
+    0x0207089082000122ULL, 0x0060A100040004B7ULL, 0x80000801B0004104ULL, 0x0020040030408102ULL
+};
+
+constexpr uint64_t BISHOP_MAGICS[64] = {
+    0x2003280470207080ULL, 0xA182061024808202ULL, 0x02014801012010A0ULL, 0x000818048400C040ULL,
+    0x04010140410C0020ULL, 0x00015040840800D0ULL, 0x0080A12200401000ULL, 0x110201B544002802ULL,
+    0xA08410004200A210ULL, 0x001022A801101002ULL, 0x084002540100A008ULL, 0x080009104C400001ULL,
+    0x040012C868080828ULL, 0x540000901000C200ULL, 0x0A00810014040500ULL, 0x0000288224021100ULL,
+    0x00030510B0D0A0C0ULL, 0x0009000B03011821ULL, 0x200118042042020BULL, 0x10280028A0800883ULL,
+    0x0406202400A00005ULL, 0x0800208402004000ULL, 0x40A0240004271000ULL, 0x0108A23100101000ULL,
+    0x8000D08400420214ULL, 0x2000A14A00388900ULL, 0x0C804040500011C2ULL, 0x000400420C010042ULL,
+    0x0000802002020040ULL, 0x0001548000820105ULL, 0x0000403240801A02ULL, 0x0081020801002088ULL,
+    0x4008004000050800ULL, 0x0C01808080004811ULL, 0x2400241080008084ULL, 0x4400C018080B8200ULL,
+    0x4040020200202081ULL, 0x000021048000102EULL, 0x0114018010210210ULL, 0x0904000821024108ULL,
+    0x085886424D40D000ULL, 0x4000108018021340ULL, 0x020C084110041202ULL, 0x00000C3010100204ULL,
+    0x0008455600802804ULL, 0x2AD0210108020700ULL, 0x000080202EAA5500ULL, 0x88D00010A0080100ULL,
+    0xC080240C4A100088ULL, 0x4404602112080000ULL, 0x00400042011C8900ULL, 0x2000040240088094ULL,
+    0x4021002060404000ULL, 0x0080056040408408ULL, 0x201108042804C028ULL, 0x0000244115882200ULL,
+    0x2400041880144002ULL, 0x0010010301015000ULL, 0x0520004202222C06ULL, 0x20048A8124020900ULL,
+    0x001900083010C040ULL, 0x0000084008480014ULL, 0x01007E080100A280ULL, 0x0480821102622A08ULL
+};
+
+uint64_t rook_table[64][1 << ROOK_BITS];
+uint64_t bishop_table[64][1 << BISHOP_BITS];
+
+Magic rook_magics[64];
+Magic bishop_magics[64];
+
+uint64_t between_table[64][64];
+uint64_t line_table[64][64];
+
+// Walk each ray until it leaves the board or hits a blocker (init only)
+uint64_t ray_attacks(int from, uint64_t blockers, const int dirs[4][2]) {
+    uint64_t attacks = 0;
+    
+    for (int d = 0; d < 4; d++) {
+        int f = file_of(from) + dirs[d][0];
+        int r = rank_of(from) + dirs[d][1];
+        
+        while (f >= 0 && f < 8 && r >= 0 && r < 8) {
+            int sq = square(f, r);
+            set(attacks, sq);
+            if (blockers & (1ULL << sq)) break;
+            f += dirs[d][0];
+            r += dirs[d][1];
+        }
+    }
+    
+    return attacks;
+}
+
+void init_slider(Magic* magics, uint64_t* table, const uint64_t* numbers,
+                 int bits, const int dirs[4][2]) {
+    constexpr uint64_t RANK_1_8 = 0xFF000000000000FFULL;
+    constexpr uint64_t FILE_A_H = 0x8181818181818181ULL;
+    
+    for (int sq = 0; sq < 64; sq++) {
+        // Edge squares never block anything beyond them, unless the piece is on that edge
+        uint64_t rank_bb = 0xFFULL << (rank_of(sq) * 8);
+        uint64_t file_bb = 0x0101010101010101ULL << file_of(sq);
+        uint64_t edges = (RANK_1_8 & ~rank_bb) | (FILE_A_H & ~file_bb);
+        
+        Magic& m = magics[sq];
+        m.mask = ray_attacks(sq, 0, dirs) & ~edges;
+        m.magic = numbers[sq];
+        m.attacks = table + sq * (1 << bits);
+        m.shift = 64 - bits;
+        
+        // Enumerate every subset of the mask (Carry-Rippler)
+        uint64_t occupied = 0;
+        do {
+            m.attacks[m.index(occupied)] = ray_attacks(sq, occupied, dirs);
+            occupied = (occupied - m.mask) & m.mask;
+        } while (occupied);
+    }
+}
+
+} // namespace
+
+void init() {
+    init_slider(rook_magics, &rook_table[0][0], ROOK_MAGICS, ROOK_BITS, ROOK_DIRS);
+    init_slider(bishop_magics, &bishop_table[0][0], BISHOP_MAGICS, BISHOP_BITS, BISHOP_DIRS);
+    
+    for (int a = 0; a < 64; a++) {
+        for (int b = 0; b < 64; b++) {
+            between_table[a][b] = line_table[a][b] = 0;
+            if (a == b) continue;
+            
+            uint64_t a_bb = 1ULL << a;
+            uint64_t b_bb = 1ULL << b;
+            if (rook_attacks(a, 0) & b_bb) {
+                between_table[a][b] = rook_attacks(a, b_bb) & rook_attacks(b, a_bb);
+                line_table[a][b] = (rook_attacks(a, 0) & rook_attacks(b, 0)) | a_bb | b_bb;
+            } else if (bishop_attacks(a, 0) & b_bb) {
+                between_table[a][b] = bishop_attacks(a, b_bb) & bishop_attacks(b, a_bb);
+                line_table[a][b] = (bishop_attacks(a, 0) & bishop_attacks(b, 0)) | a_bb | b_bb;
+            }
+        }
+    }
+}
+
+uint64_t between(int from, int to) {
+    return between_table[from][to];
+}
+
+uint64_t line(int from, int to) {
+    return line_table[from][to];
+}
+
+uint64_t bishop_attacks(int square, uint64_t blockers) {
+    const Magic& m = bishop_magics[square];
+    return m.attacks[m.index(blockers)];
+}
+
+uint64_t rook_attacks(int square, uint64_t blockers) {
+    const Magic& m = rook_magics[square];
+    return m.attacks[m.index(blockers)];
+}
+
+} // namespace Bitboards